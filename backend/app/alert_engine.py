@@ -19,7 +19,8 @@ def expiry_alert(purchases_df, days=30):
     batch_cols = ["Batch_Number", "Batch_No", "Batch"]
     for col in batch_cols:
         if col in df.columns:
-            df["batch"] = df[col]
+            # Categorical batches cannot take a new fill value
+            df["batch"] = df[col].astype(object)
             break
     else:
         df["batch"] = "—"
@@ -1,5 +1,7 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+import os
+import pickle
+import threading
+
 import numpy as np
 
 # ---------------- TRAINING DATA ----------------
@@ -22,22 +24,80 @@ TRAINING_DATA = [
     ("low stock reorder list", "REORDER")
 ]
 
-texts = [q for q, _ in TRAINING_DATA]
-labels = [i for _, i in TRAINING_DATA]
+# Prebuilt (vectorizer, model) pair, written by `python -m app.chatbot_ai`.
+# Build it with the same scikit-learn version the API runs on.
+MODEL_PATH = os.environ.get(
+    "INTENT_MODEL_PATH",
+    os.path.join(os.path.dirname(__file__), "intent_model.pkl")
+)
+
+_model = None
+_model_lock = threading.Lock()
+
 
 # ---------------- MODEL ----------------
-vectorizer = TfidfVectorizer(
-    ngram_range=(1, 2),
-    stop_words="english"
-)
+def train_model():
+    # Fitting is the slow part; keep sklearn's training imports off module scope
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    texts = [q for q, _ in TRAINING_DATA]
+    labels = [i for _, i in TRAINING_DATA]
+
+    vectorizer = TfidfVectorizer(
+        ngram_range=(1, 2),
+        stop_words="english"
+    )
+
+    X = vectorizer.fit_transform(texts)
+
+    model = LogisticRegression()
+    model.fit(X, labels)
+
+    return vectorizer, model
+
 
-X = vectorizer.fit_transform(texts)
+def save_model(path=MODEL_PATH):
+    vectorizer, model = train_model()
+    with open(path, "wb") as f:
+        pickle.dump((vectorizer, model), f)
+    return vectorizer, model
+
+
+def load_model(path=MODEL_PATH):
+    with open(path, "rb") as f:
+        loaded = pickle.load(f)
+
+    if (
+        not isinstance(loaded, tuple) or len(loaded) != 2 or
+        not hasattr(loaded[0], "transform") or
+        not hasattr(loaded[1], "predict_proba")
+    ):
+        raise ValueError("Not a (vectorizer, model) pair")
+
+    return loaded
+
+
+def get_model():
+    global _model
+
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                try:
+                    _model = load_model()
+                except Exception as e:
+                    # Missing, corrupt or version-incompatible artifact
+                    print(f"Intent model load failed ({MODEL_PATH}): {e!r}; training in-process")
+                    _model = train_model()
+
+    return _model
 
-model = LogisticRegression()
-model.fit(X, labels)
 
 # ---------------- PREDICTION ----------------
 def predict_intent(query: str):
+    vectorizer, model = get_model()
+
     vec = vectorizer.transform([query.lower()])
     probs = model.predict_proba(vec)[0]
 
@@ -46,3 +106,8 @@ def predict_intent(query: str):
     confidence = float(probs[idx])
 
     return intent, confidence
+
+
+if __name__ == "__main__":
+    save_model()
+    print(f"Intent model written to {MODEL_PATH}")
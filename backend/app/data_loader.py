@@ -1,6 +1,17 @@
 import pandas as pd
 import re
 
+# Strings repeating this often or more are stored as categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+# Monetary columns keep float64 so wastage / revenue totals stay exact
+KEEP_FLOAT64 = {
+    "MRP_Unit_Price",
+    "Total_Amount",
+    "Unit_Cost_Price",
+    "Total_Purchase_Cost"
+}
+
 def normalize_name(name: str) -> str:
     if pd.isna(name):
         return "unknown"
@@ -10,7 +21,49 @@ def normalize_name(name: str) -> str:
     return name.strip()
 
 
-def load_and_clean():
+def compact_frame(df):
+    df = df.copy()
+
+    for col in df.columns:
+        series = df[col]
+
+        if pd.api.types.is_datetime64_any_dtype(series):
+            # Source data only has day precision
+            df[col] = series.dt.normalize().astype("datetime64[s]")
+
+        elif pd.api.types.is_bool_dtype(series) or col in KEEP_FLOAT64:
+            continue
+
+        elif pd.api.types.is_numeric_dtype(series):
+            if series.notna().all() and (series % 1 == 0).all():
+                df[col] = pd.to_numeric(series, downcast="integer")
+            else:
+                df[col] = pd.to_numeric(series, downcast="float")
+
+        elif series.nunique(dropna=True) <= len(series) * CATEGORY_MAX_RATIO:
+            df[col] = series.astype("category")
+
+    return df
+
+
+def memory_report(df):
+    usage = df.memory_usage(deep=True, index=False)
+
+    return {
+        "rows": int(len(df)),
+        "total_bytes": int(usage.sum()),
+        "columns": [
+            {
+                "column": col,
+                "dtype": str(df[col].dtype),
+                "bytes": int(usage[col])
+            }
+            for col in df.columns
+        ]
+    }
+
+
+def load_and_clean(compact=True):
     sales = pd.read_json("../data/pharmacy_sales_noisy.json")
     purchases = pd.read_json("../data/pharmacy_purchases_noisy.json")
 
@@ -40,4 +93,8 @@ def load_and_clean():
     # Batch (safe fallback)
     purchases["Batch_No"] = purchases.get("Batch_No", "UNKNOWN")
 
+    if compact:
+        sales = compact_frame(sales)
+        purchases = compact_frame(purchases)
+
     return sales, purchases
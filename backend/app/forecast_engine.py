@@ -1,4 +1,3 @@
-from prophet import Prophet
 import pandas as pd
 from datetime import timedelta
 
@@ -20,6 +19,9 @@ def forecast_demand(df, drug):
     if len(ts) < 10:
         return []
 
+    # Prophet pulls in cmdstanpy; import on first forecast, not at startup
+    from prophet import Prophet
+
     model = Prophet()
     model.fit(ts)
 
@@ -2,19 +2,23 @@ import pandas as pd
 
 def calculate_inventory(sales, purchases):
     sold = (
-        sales.groupby("Drug_Name")["Qty_Sold"]
+        sales.groupby("Drug_Name", observed=True)["Qty_Sold"]
         .sum()
         .reset_index()
         .rename(columns={"Qty_Sold": "sold"})
     )
 
     bought = (
-        purchases.groupby("Drug_Name")["Qty_Received"]
+        purchases.groupby("Drug_Name", observed=True)["Qty_Received"]
         .sum()
         .reset_index()
         .rename(columns={"Qty_Received": "received"})
     )
 
+    # Sales and purchases carry separate categoricals; merge on plain strings
+    bought["Drug_Name"] = bought["Drug_Name"].astype(str)
+    sold["Drug_Name"] = sold["Drug_Name"].astype(str)
+
     inventory = pd.merge(bought, sold, on="Drug_Name", how="left")
     inventory["sold"] = inventory["sold"].fillna(0)
 
@@ -1,13 +1,22 @@
-from fastapi import FastAPI
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Annotated, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 import pandas as pd
 
-from .data_loader import load_and_clean
+from .data_loader import load_and_clean, memory_report
 from .inventory_engine import calculate_inventory
 from .forecast_engine import forecast_demand
 from .alert_engine import low_stock_alert, expiry_alert
 from .chatbot import process_chat
+from .chatbot_ai import get_model
+from .rollup_engine import FREQUENCIES, build_rollups
 from .reorder_engine import create_reorder_request
 
 
@@ -17,8 +26,48 @@ from .reorder_engine import create_reorder_request
 # LOAD DATA ON STARTUP
 # =====================================================
 
-sales, purchases = load_and_clean()
-inventory = calculate_inventory(sales, purchases)
+# Set PHARMACY_EAGER_LOAD=1 to block startup until data is loaded
+EAGER_LOAD = os.environ.get("PHARMACY_EAGER_LOAD", "0") == "1"
+
+# Paths that answer before the data is loaded
+UNGUARDED_PATHS = {"/health", "/ready", "/docs", "/redoc", "/openapi.json"}
+
+sales = None
+purchases = None
+inventory = None
+rollups = None
+data_ready = False
+load_error = None
+
+
+def load_data():
+    global sales, purchases, inventory, rollups, data_ready, load_error
+
+    try:
+        sales, purchases = load_and_clean()
+        inventory = calculate_inventory(sales, purchases)
+        rollups = build_rollups(sales, purchases)
+
+        # Warm the intent model before reporting ready so the chatbot works
+        # on every worker that receives traffic
+        get_model()
+
+        data_ready = True
+    except Exception as e:
+        load_error = str(e)
+        print("Data load error:", e)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    if EAGER_LOAD:
+        load_data()
+        yield
+        return
+
+    task = asyncio.create_task(asyncio.to_thread(load_data))
+    yield
+    await task
 
 
 # =====================================================
@@ -28,9 +77,22 @@ inventory = calculate_inventory(sales, purchases)
 app = FastAPI(
     title="Smart Pharmacy Inventory Management API",
     version="1.0.0",
-    description="AI-powered HealthTech inventory intelligence system"
+    description="AI-powered HealthTech inventory intelligence system",
+    lifespan=lifespan
 )
 
+# CORS is added last so it also wraps the 503 responses
+@app.middleware("http")
+async def require_data(request: Request, call_next):
+    if not data_ready and request.url.path not in UNGUARDED_PATHS:
+        detail = (
+            f"Data load failed: {load_error}" if load_error
+            else "Data is still loading"
+        )
+        return JSONResponse(status_code=503, content={"detail": detail})
+    return await call_next(request)
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],   # hackathon-safe
@@ -39,6 +101,28 @@ app.add_middleware(
 )
 
 
+# =====================================================
+# HEALTH
+# =====================================================
+
+@app.get("/health", tags=["Health"])
+def health():
+    return {"status": "ok"}
+
+
+@app.get("/ready", tags=["Health"])
+def ready():
+    if not data_ready:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "error" if load_error else "loading",
+                "error": load_error
+            }
+        )
+    return {"status": "ready"}
+
+
 # =====================================================
 # SCHEMAS
 # =====================================================
@@ -53,32 +137,13 @@ class ChatbotRequest(BaseModel):
 
 @app.get("/dashboard-kpis")
 def dashboard_kpis():
-    today = pd.Timestamp.now()
-
-    unique_medicines = pd.concat([
-        sales["Drug_Name"],
-        purchases["Drug_Name"]
-    ]).nunique()
-
-    total_units = int(
-        purchases["Qty_Received"].sum() -
-        sales["Qty_Sold"].sum()
-    )
-    total_units = max(total_units, 0)
+    stock_by_drug = rollups.stock_by_drug()
 
-    stock_by_drug = purchases.groupby("Drug_Name")["Qty_Received"].sum().sub(
-        sales.groupby("Drug_Name")["Qty_Sold"].sum(),
-        fill_value=0
-    )
+    unique_medicines = int(stock_by_drug.index.nunique())
 
+    total_units = max(int(stock_by_drug.sum()), 0)
     low_stock_count = int((stock_by_drug < 50).sum())
-
-    expiring_soon = int(
-        purchases[
-            (purchases["Expiry_Date"] >= today) &
-            ((purchases["Expiry_Date"] - today).dt.days <= 30)
-        ].shape[0]
-    )
+    expiring_soon = rollups.expiring_batches(days=30)
 
     return {
         "unique_medicines": unique_medicines,
@@ -88,6 +153,26 @@ def dashboard_kpis():
     }
 
 
+# =====================================================
+# MEMORY
+# =====================================================
+
+@app.get("/memory-report", tags=["Health"])
+def get_memory_report():
+    frames = {
+        "sales": memory_report(sales),
+        "purchases": memory_report(purchases),
+        "inventory": memory_report(inventory)
+    }
+    for freq, table in rollups.tables.items():
+        frames[f"rollup_{freq}"] = memory_report(table)
+
+    return {
+        "total_bytes": sum(f["total_bytes"] for f in frames.values()),
+        "frames": frames
+    }
+
+
 # =====================================================
 # INVENTORY
 # =====================================================
@@ -124,48 +209,108 @@ def get_expiry_alerts():
 # WASTAGE
 # =====================================================
 
-@app.get("/wastage", tags=["Analytics"])
-def get_wastage():
-    expired = purchases[purchases["Expiry_Date"] < pd.Timestamp.now()]
+def _check_range(start, end):
+    if start is not None and end is not None and end < start:
+        raise HTTPException(
+            status_code=400,
+            detail="end must not be before start"
+        )
 
-    if expired.empty:
-        return {"wastage_cost": 0.0}
 
-    wastage_cost = float(
-        (expired["Qty_Received"] * expired["Unit_Cost_Price"]).sum()
-    )
+@app.get("/wastage", tags=["Analytics"])
+def get_wastage(
+    start: Annotated[Optional[date], Query(
+        description="First expiry day to include (inclusive)"
+    )] = None,
+    end: Annotated[Optional[date], Query(
+        description="Last expiry day to include (inclusive); capped at today"
+    )] = None
+):
+    _check_range(start, end)
+
+    wastage_cost = rollups.expired_value(start, end)
 
     return {"wastage_cost": round(wastage_cost, 2)}
 
 
 # =====================================================
-# EXPIRY RISK ANALYTICS
+# TRENDS (ROLLUPS)
 # =====================================================
 
-@app.get("/expiry-risk", tags=["Analytics"])
-def expiry_risk():
-    today = pd.Timestamp.now()
-    df = purchases.copy()
+# Trend ranges select whole buckets: start is floored to its bucket and
+# every bucket starting on or before end is included, so a monthly query
+# with end=2024-01-15 returns all of January.
+BucketStart = Annotated[Optional[date], Query(
+    description="Include the bucket containing this date and later ones"
+)]
+BucketEnd = Annotated[Optional[date], Query(
+    description="Include every bucket that starts on or before this date"
+)]
 
-    df["days_to_expiry"] = (df["Expiry_Date"] - today).dt.days
-    df = df[df["days_to_expiry"].notna()]
 
-    df["stock_value"] = df["Qty_Received"] * df["Unit_Cost_Price"]
+def _query_rollups(freq, start, end, drug, supplier):
+    _check_range(start, end)
 
-    high = df[df["days_to_expiry"] <= 7]
-    medium = df[(df["days_to_expiry"] > 7) & (df["days_to_expiry"] <= 30)]
-    low = df[df["days_to_expiry"] > 30]
+    if freq not in FREQUENCIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"freq must be one of {', '.join(FREQUENCIES)}"
+        )
+    return rollups.query(freq, start, end, drug, supplier)
+
+
+@app.get("/analytics/trends", tags=["Analytics"])
+def get_trends(
+    freq: str = "monthly",
+    start: BucketStart = None,
+    end: BucketEnd = None,
+    drug: Optional[str] = None,
+    supplier: Optional[str] = None
+):
+    df = _query_rollups(freq, start, end, drug, supplier)
+
+    trends = df.groupby("period", as_index=False)[[
+        "qty_sold",
+        "revenue",
+        "qty_received",
+        "purchase_cost",
+        "expired_value"
+    ]].sum()
+    trends["period"] = trends["period"].dt.strftime("%Y-%m-%d")
+
+    return trends.round(2).to_dict(orient="records")
+
+
+@app.get("/analytics/rollup", tags=["Analytics"])
+def get_rollup(
+    freq: str = "monthly",
+    start: BucketStart = None,
+    end: BucketEnd = None,
+    drug: Optional[str] = None,
+    supplier: Optional[str] = None
+):
+    df = _query_rollups(freq, start, end, drug, supplier)
+    df["period"] = df["period"].dt.strftime("%Y-%m-%d")
+
+    return df.round(2).to_dict(orient="records")
+
+
+# =====================================================
+# EXPIRY RISK ANALYTICS
+# =====================================================
+
+@app.get("/expiry-risk", tags=["Analytics"])
+def expiry_risk():
+    risk = rollups.expiry_risk()
 
     return {
         "distribution": [
-            {"name": "High Risk", "value": int(len(high))},
-            {"name": "Medium Risk", "value": int(len(medium))},
-            {"name": "Low Risk", "value": int(len(low))}
+            {"name": name, "value": count}
+            for name, (count, _) in risk.items()
         ],
         "value_at_risk": [
-            {"name": "High Risk", "value": float(high["stock_value"].sum())},
-            {"name": "Medium Risk", "value": float(medium["stock_value"].sum())},
-            {"name": "Low Risk", "value": float(low["stock_value"].sum())}
+            {"name": name, "value": value}
+            for name, (_, value) in risk.items()
         ]
     }
 
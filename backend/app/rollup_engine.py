@@ -0,0 +1,272 @@
+import pandas as pd
+
+from .data_loader import normalize_name
+
+# Pandas period aliases for each rollup granularity
+FREQUENCIES = {
+    "daily": "D",
+    "weekly": "W",
+    "monthly": "M"
+}
+
+KEYS = ["period", "Drug_Name", "Supplier_Name"]
+
+# Key columns stored as categoricals sharing one category set per store
+CATEGORY_KEYS = ["Drug_Name", "Supplier_Name"]
+
+# qty_sold / revenue are bucketed by sale date,
+# qty_received / purchase_cost by receipt date,
+# expiry_* by expiry date
+MEASURES = [
+    "qty_sold",
+    "revenue",
+    "qty_received",
+    "purchase_cost",
+    "expiry_qty",
+    "expiry_value",
+    "expiry_batches"
+]
+
+
+def _bucket(dates, freq):
+    return dates.dt.to_period(FREQUENCIES[freq]).dt.start_time
+
+
+def _empty_table():
+    table = pd.DataFrame(columns=KEYS + MEASURES)
+    table["period"] = pd.to_datetime(table["period"])
+    return table
+
+
+def _merge(table, delta):
+    # Rollups are additive, so merging a delta is a keyed sum.
+    # The groupby also keeps every table sorted by period for _slice.
+    if delta.empty:
+        return table
+
+    frames = [table, delta] if not table.empty else [delta]
+
+    return (
+        pd.concat(frames, ignore_index=True)
+        .groupby(KEYS, as_index=False, observed=True)[MEASURES]
+        .sum()
+    )
+
+
+def _slice(table, start=None, end=None):
+    # Binary search on the sorted period column instead of a full-table mask
+    periods = table["period"]
+    lo = periods.searchsorted(start, side="left") if start is not None else 0
+    hi = periods.searchsorted(end, side="right") if end is not None else len(table)
+    return table.iloc[lo:hi]
+
+
+def _to_daily(facts, date_col, measures):
+    facts = facts[facts[date_col].notna()]
+
+    daily = (
+        facts
+        .assign(period=facts[date_col].dt.normalize())
+        .groupby(KEYS, as_index=False, observed=True)[list(measures)]
+        .sum()
+    )
+
+    for col in MEASURES:
+        if col not in daily.columns:
+            daily[col] = 0
+
+    return daily[KEYS + MEASURES]
+
+
+def _as_key(series):
+    series = series.astype("category")
+    if series.isna().any():
+        if "UNKNOWN" not in series.cat.categories:
+            series = series.cat.add_categories("UNKNOWN")
+        series = series.fillna("UNKNOWN")
+    return series.cat.remove_unused_categories()
+
+
+def _to_range(value):
+    return pd.Timestamp(value).normalize() if value is not None else None
+
+
+class RollupStore:
+    """Time-bucketed drug x supplier aggregates of the sales and purchase frames."""
+
+    def __init__(self):
+        self.tables = {freq: _empty_table() for freq in FREQUENCIES}
+        self.batch_supplier = {}
+        self.categories = {col: pd.Index([]) for col in CATEGORY_KEYS}
+
+        # Undated per-drug totals, so rows with an unparseable date still count
+        self.stock = pd.DataFrame(columns=["qty_received", "qty_sold"], dtype=float)
+
+    # ---------------- MAINTENANCE ----------------
+    def add_purchases(self, purchases):
+        batches = purchases[["Batch_Number", "Supplier_Name"]].astype(object).dropna()
+        for batch, supplier in zip(batches["Batch_Number"], batches["Supplier_Name"]):
+            self.batch_supplier.setdefault(batch, supplier)
+
+        facts = pd.DataFrame({
+            "Drug_Name": _as_key(purchases["Drug_Name"]),
+            "Supplier_Name": _as_key(purchases["Supplier_Name"]),
+            "Date_Received": purchases["Date_Received"],
+            "Expiry_Date": purchases["Expiry_Date"],
+            "qty_received": purchases["Qty_Received"],
+            "purchase_cost": purchases["Qty_Received"] * purchases["Unit_Cost_Price"],
+            "expiry_qty": purchases["Qty_Received"],
+            "expiry_batches": 1
+        })
+        facts["expiry_value"] = facts["purchase_cost"]
+        self._align_keys(facts)
+
+        received = _to_daily(
+            facts, "Date_Received", ["qty_received", "purchase_cost"]
+        )
+        expiring = _to_daily(
+            facts, "Expiry_Date", ["expiry_qty", "expiry_value", "expiry_batches"]
+        )
+
+        self._add_daily(pd.concat([received, expiring], ignore_index=True))
+        self._add_stock(facts, "qty_received")
+
+    def add_sales(self, sales):
+        # Sales carry no supplier; attribute them through the batch received
+        batch_col = "Batch_Number" if "Batch_Number" in sales.columns else "Batch_No"
+        supplier = sales[batch_col].map(self.batch_supplier)
+
+        facts = pd.DataFrame({
+            "Drug_Name": _as_key(sales["Drug_Name"]),
+            "Supplier_Name": _as_key(supplier),
+            "Date": sales["Date"],
+            "qty_sold": sales["Qty_Sold"],
+            "revenue": sales["Qty_Sold"] * sales["MRP_Unit_Price"]
+        })
+        self._align_keys(facts)
+
+        self._add_daily(_to_daily(facts, "Date", ["qty_sold", "revenue"]))
+        self._add_stock(facts, "qty_sold")
+
+    def _align_keys(self, facts):
+        # Union new categories into the store so concat/merge keep categoricals
+        for col in CATEGORY_KEYS:
+            known = self.categories[col]
+            new = facts[col].cat.categories.difference(known)
+
+            if len(new):
+                known = known.append(new)
+                self.categories[col] = known
+                for table in self.tables.values():
+                    if not table.empty:
+                        table[col] = table[col].cat.set_categories(known)
+
+            facts[col] = facts[col].cat.set_categories(known)
+
+    def _add_stock(self, facts, col):
+        delta = facts.groupby("Drug_Name", observed=True)[col].sum().to_frame()
+        delta.index = delta.index.astype(str)
+        self.stock = self.stock.add(delta, fill_value=0).fillna(0)
+
+    def _add_daily(self, daily):
+        for freq in FREQUENCIES:
+            delta = daily
+            if freq != "daily":
+                delta = (
+                    daily
+                    .assign(period=_bucket(daily["period"], freq))
+                    .groupby(KEYS, as_index=False, observed=True)[MEASURES]
+                    .sum()
+                )
+            self.tables[freq] = _merge(self.tables[freq], delta)
+
+    # ---------------- QUERIES ----------------
+    def query(self, freq="daily", start=None, end=None, drug=None, supplier=None):
+        """Rows for every bucket overlapping [start, end], both inclusive."""
+        if freq not in FREQUENCIES:
+            raise ValueError(f"Unknown frequency: {freq}")
+
+        today = pd.Timestamp.now().normalize()
+        start, end = _to_range(start), _to_range(end)
+        if start is not None and end is not None and end < start:
+            raise ValueError("end must not be before start")
+        if start is not None:
+            start = _bucket(pd.Series([start]), freq).iloc[0]
+
+        df = _slice(self.tables[freq], start, end)
+        if drug:
+            df = df[df["Drug_Name"] == normalize_name(drug)]
+        if supplier:
+            df = df[df["Supplier_Name"] == supplier]
+        df = df.copy()
+
+        # Past buckets are fully expired; only the current one needs the daily table
+        current = _bucket(pd.Series([today]), freq).iloc[0]
+        df["expired_value"] = df["expiry_value"].where(df["period"] < current, 0.0)
+
+        in_current = df["period"] == current
+        if in_current.any():
+            partial = (
+                _slice(self.tables["daily"], current, today)
+                .groupby(["Drug_Name", "Supplier_Name"], observed=True)["expiry_value"]
+                .sum()
+            )
+            keys = pd.MultiIndex.from_frame(
+                df.loc[in_current, ["Drug_Name", "Supplier_Name"]]
+            )
+            df.loc[in_current, "expired_value"] = (
+                partial.reindex(keys, fill_value=0).to_numpy()
+            )
+
+        return df.reset_index(drop=True)
+
+    def expired_value(self, start=None, end=None):
+        # Same cut-off as the raw-frame wastage: expiry day on or before today
+        today = pd.Timestamp.now().normalize()
+        start, end = _to_range(start), _to_range(end)
+        end = today if end is None else min(end, today)
+
+        if start is not None and end < start:
+            return 0.0
+
+        return float(_slice(self.tables["daily"], start, end)["expiry_value"].sum())
+
+    def expiring_batches(self, days=30):
+        # Batches expiring after today and within `days` full days from now
+        today = pd.Timestamp.now().normalize()
+        window = _slice(
+            self.tables["daily"],
+            today + pd.Timedelta(days=1),
+            today + pd.Timedelta(days=days + 1)
+        )
+        return int(window["expiry_batches"].sum())
+
+    def expiry_risk(self):
+        # (Expiry_Date - now).dt.days is one less than the whole days left,
+        # so "days <= 7" means expiry day <= today + 8 (already expired included)
+        today = pd.Timestamp.now().normalize()
+        daily = self.tables["daily"]
+        bands = {
+            "High Risk": _slice(daily, None, today + pd.Timedelta(days=8)),
+            "Medium Risk": _slice(
+                daily,
+                today + pd.Timedelta(days=9),
+                today + pd.Timedelta(days=31)
+            ),
+            "Low Risk": _slice(daily, today + pd.Timedelta(days=32))
+        }
+
+        return {
+            name: (int(rows["expiry_batches"].sum()), float(rows["expiry_value"].sum()))
+            for name, rows in bands.items()
+        }
+
+    def stock_by_drug(self):
+        return self.stock["qty_received"] - self.stock["qty_sold"]
+
+
+def build_rollups(sales, purchases):
+    store = RollupStore()
+    store.add_purchases(purchases)
+    store.add_sales(sales)
+    return store